@@ -1,3 +1,6 @@
+# Import partial to bind button arguments
+from functools import partial
+
 # Import Maya commands as 'mc' and MEL commands as 'mel'
 import maya.cmds as mc
 import maya.mel as mel
@@ -5,17 +8,31 @@ import maya.mel as mel
 # Import Maya vector for 3D manipulation and OpenMayaUI for UI interaction
 from maya.OpenMaya import MVector
 import maya.OpenMayaUI as omui
+import maya.api.OpenMaya as om2# Python API 2.0 for fast mesh queries
+
+# Import numpy for fast array math on UV coordinates
+import numpy as np
 
 # Import PySide2 for GUI creation and shiboken2 to handle QWidget instances in Maya
 from PySide2.QtWidgets import QVBoxLayout, QWidget, QPushButton, QMainWindow, QHBoxLayout, QGridLayout, QLineEdit, QLabel, QSlider
 from PySide2.QtCore import Qt
-from shiboken2 import wrapInstance
+from shiboken2 import wrapInstance, isValid
 
+# Import the shared tool and refresh context managers, relative when loaded from the shelf as <plugin>.src,
+# absolute when the file is run as a top-level script (src folder on Maya's Python path)
+try:
+    from .mayaUtils import ToolContext, SuspendRefresh
+except ImportError:
+    from mayaUtils import ToolContext, SuspendRefresh
 
-#copy/paste the following on the MEL Maya script Editor to connect VSC to Maya then Alt + Shift + M to run the code
+
+#copy/paste the following on the MEL Maya script Editor to connect VSC to Maya then Alt + Shift + M to run the code (add this src folder to Maya's Python path first so mayaUtils can be imported)
 #commandPort -n "localhost:7001" -stp "mel";
 
 class TrimSheetBuilderWidget(QWidget): # Define custom QWidget for the trim sheet builder
+    instance = None# Widget shown by Run(), reused instead of rebuilding the UI every time
+    mayaMainWindow = None# Maya's main window, wrapped once since it never changes during a session
+
     def __init__(self):
         mainWindow: QMainWindow = TrimSheetBuilderWidget.GetMayaMainWindow()# Get Maya's main window as the parent
 
@@ -24,6 +41,7 @@ class TrimSheetBuilderWidget(QWidget): # Define custom QWidget for the trim shee
             existing.deleteLater()
 
         super().__init__(parent=mainWindow)# Initialize the QWidget with Maya's main window as its parent
+        self.setUpdatesEnabled(False)# Hold repaints while the UI is built so Qt lays it out once
         
         self.setWindowTitle("Trim sheet Builder")# Set the window title
         self.setWindowFlags(Qt.Window)# Set window flags for independent window behavior
@@ -36,13 +54,23 @@ class TrimSheetBuilderWidget(QWidget): # Define custom QWidget for the trim shee
         self.setLayout(self.masterLayout)
         self.CreateInitializationSection()# Call function to create initialization UI
         self.CreateManipulationSection()# Call function to create manipulation UI
+        self.setUpdatesEnabled(True)# UI is built, allow repaints again
 
     def FillShellToU1V1(self):# Method to scale UV shell to fit within U1V1 space
-        width, height = self.GetShellSize()# Get current shell dimensions
-        su = 1 / width  # Calculate scale factor for U direction
-        sv = 1 / height  # Calculate scale factor for V direction
-        self.ScaleShell(su, sv)  # Scale shell to fit within UV space
-        self.MoveToOrigin()  # Move shell to origin after scaling
+        with SuspendRefresh():# Redraw once when every command has run
+            minCoord, maxCoord = self.GetShellBound()# Get current shell bounds once
+            su = 1 / (maxCoord[0] - minCoord[0])  # Calculate scale factor for U direction
+            sv = 1 / (maxCoord[1] - minCoord[1])  # Calculate scale factor for V direction
+            if abs(su - 1) > 1e-2 and abs(sv - 1) > 1e-2:
+                # Scale around the pivot that lands the shell's min corner on the origin, so no move is needed after.
+                # The pivot grows as the scale gets close to 1, so this is only used while it stays small enough for float UVs
+                pu = su * minCoord[0] / (su - 1)
+                pv = sv * minCoord[1] / (sv - 1)
+                mc.polyEditUV(self.shell, pu=pu, pv=pv, su=su, sv=sv, r=True)
+            else:
+                # The scale is too close to 1 for a precise pivot, scale around the min corner then move it to the origin
+                mc.polyEditUV(self.shell, pu=minCoord[0], pv=minCoord[1], su=su, sv=sv, r=True)
+                mc.polyEditUV(self.shell, u=-minCoord[0], v=-minCoord[1])
 
     def GetShellSize(self):  # Method to get UV shell dimensions
         min, max = self.GetShellBound()  # Get min and max bounds of the UV shell
@@ -51,13 +79,15 @@ class TrimSheetBuilderWidget(QWidget): # Define custom QWidget for the trim shee
         return width, height  # Return width and height as a tuple
 
     def ScaleShell(self, u, v):  # Method to scale UV shell based on specified U and V factors
-        mc.polyEditUV(self.shell, su=u, sv=v, r=True)  # Apply scaling to UV shell
+        with ToolContext("selectSuperContext"):# Run the UV edit with the Select tool active
+            mc.polyEditUV(self.shell, su=u, sv=v, r=True)  # Apply scaling to UV shell
 
     def MoveShell(self, u, v):  # Method to move the UV shell by a specified U and V offset
-        width, height = self.GetShellSize()  # Get current shell dimensions
-        uAmt = u * width  # Calculate movement amount in U direction
-        vAmt = v * height  # Calculate movement amount in V direction
-        mc.polyEditUV(self.shell, u=uAmt, v=vAmt)  # Move UV shell by specified amounts
+        with ToolContext("selectSuperContext"):# Run the UV edit with the Select tool active
+            width, height = self.GetShellSize()  # Get current shell dimensions
+            uAmt = u * width  # Calculate movement amount in U direction
+            vAmt = v * height  # Calculate movement amount in V direction
+            mc.polyEditUV(self.shell, u=uAmt, v=vAmt)  # Move UV shell by specified amounts
 
     def CreateManipulationSection(self):# Create UI section for UV shell manipulation controls
         sectionLayout = QVBoxLayout()# Define vertical layout for manipulation section
@@ -79,73 +109,52 @@ class TrimSheetBuilderWidget(QWidget): # Define custom QWidget for the trim shee
         sectionLayout.addWidget(fillU1V1Btn)
 
         # Add scaling buttons to scale shell in U and V directions
-        halfUBtn = QPushButton("Half U")
-        halfUBtn.clicked.connect(lambda : self.ScaleShell(0.5, 1))
-        sectionLayout.addWidget(halfUBtn)
-
-        halfVBtn = QPushButton("Half V")
-        halfVBtn.clicked.connect(lambda : self.ScaleShell(1, 0.5))
-        sectionLayout.addWidget(halfVBtn)
-
-        doubleUBtn = QPushButton("Double U")
-        doubleUBtn.clicked.connect(lambda : self.ScaleShell(2, 1))
-        sectionLayout.addWidget(doubleUBtn)
-
-        doubleVBtn = QPushButton("Double V")
-        doubleVBtn.clicked.connect(lambda : self.ScaleShell(1, 2))
-        sectionLayout.addWidget(doubleVBtn)
+        for label, scaleU, scaleV in [("Half U", 0.5, 1), ("Half V", 1, 0.5), ("Double U", 2, 1), ("Double V", 1, 2)]:
+            scaleBtn = QPushButton(label)
+            scaleBtn.clicked.connect(partial(self.ScaleShell, scaleU, scaleV))
+            sectionLayout.addWidget(scaleBtn)
 
         # Create grid layout for directional movement buttons
         moveSection = QGridLayout()
         sectionLayout.addLayout(moveSection)
 
-        # Add directional buttons for moving the shell in the UV space
-        moveUpBtn = QPushButton("^")
-        moveUpBtn.clicked.connect(lambda : self.MoveShell(0, 1))
-        moveSection.addWidget(moveUpBtn, 0 , 1)
-
-        moveDownBtn = QPushButton("v")
-        moveDownBtn.clicked.connect(lambda : self.MoveShell(0, -1))
-        moveSection.addWidget(moveDownBtn, 2 , 1)
+        # Add directional buttons for moving the shell in the UV space, each with its direction and grid cell
+        for label, moveU, moveV, row, column in [("^", 0, 1, 0, 1), ("v", 0, -1, 2, 1), ("<", -1, 0, 1, 0), (">", 1, 0, 1, 2)]:
+            moveBtn = QPushButton(label)
+            moveBtn.clicked.connect(partial(self.MoveShell, moveU, moveV))
+            moveSection.addWidget(moveBtn, row, column)
 
-        moveLeftBtn = QPushButton("<")
-        moveLeftBtn.clicked.connect(lambda : self.MoveShell(-1, 0))
-        moveSection.addWidget(moveLeftBtn, 1 , 0)
-
-        moveRightBtn = QPushButton(">")
-        moveRightBtn.clicked.connect(lambda : self.MoveShell(1, 0))
-        moveSection.addWidget(moveRightBtn, 1 , 2)
+    def GetShellUVs(self):# Method to get the U and V coordinates of every UV in the shell
+        uvs = mc.polyListComponentConversion(self.shell, toUV=True)# Convert shell to UV components
+        uvSel = om2.MSelectionList()# Resolve the UV components through the API instead of querying each one
+        for uv in uvs:
+            uvSel.add(uv)
+
+        us = []# U coordinates of the shell, one array per mesh
+        vs = []# V coordinates of the shell, one array per mesh
+        for i in range(uvSel.length()):# Loop through each mesh the shell lives on
+            meshPath, uvComponent = uvSel.getComponent(i)# Get the mesh and the UV ids selected on it
+            meshUs, meshVs = om2.MFnMesh(meshPath).getUVs()# Get all UVs of the mesh in a single call
+            uvIds = np.asarray(om2.MFnSingleIndexedComponent(uvComponent).getElements(), dtype=np.intp)# Get the ids of the shell UVs
+            us.append(np.asarray(meshUs, dtype=np.float64)[uvIds])# Keep only the UVs belonging to the shell
+            vs.append(np.asarray(meshVs, dtype=np.float64)[uvIds])
+        return np.concatenate(us), np.concatenate(vs)# Return U and V coordinates as two flat arrays
 
     def GetShellBound(self):# Method to get min and max UV coordinates of the shell
-        uvs = mc.polyListComponentConversion(self.shell, toUV=True)# Convert shell to UV components
-        uvs = mc.ls(uvs, fl=True)# Flatten UV list
-        firstUV = mc.polyEditUV(uvs[0], q=True)# Get coordinates of the first UV
-        minU = firstUV[0]# Initialize min and max U
-        maxU = firstUV[0]
-        minV = firstUV[1]# Initialize min and max V
-        maxV = firstUV[1]
-        for uv in uvs:# Loop through all UVs in the shell
-            uvCoord = mc.polyEditUV(uv, q=True)# Query UV coordinates
-            if uvCoord[0] < minU:# Update min U if necessary
-                minU = uvCoord[0]
-            
-            if uvCoord[0] >maxU:# Update max U if necessary
-                minU = uvCoord[0]
-
-            if uvCoord [1] < minV:# Update min V if necessary
-                minU = uvCoord[1]
-
-            if uvCoord[1] > maxV:# Update max V if necessary
-                minU = uvCoord[1]
-        return [minU, minV], [maxU, maxV]# Return bounds as min and max UV points
-    
+        us, vs = self.GetShellUVs()# Read every U and V of the shell from Maya, undo or manual edits may have moved it since the last click
+        return [us.min(), vs.min()], [us.max(), vs.max()]# Return bounds as min and max UV points
+
     def BackToOrigin(self):# Method to move UV shell to origin in UV space
-        minCoord, maxCoord = self.GetShellBound()# Get UV bounds of the shell
-        mc.polyEditUV(self.shell, u=-minCoord[0], v=-minCoord[1])# Move shell to origin
+        with SuspendRefresh():# Redraw once when every command has run
+            minCoord, maxCoord = self.GetShellBound()# Get UV bounds of the shell
+            mc.polyEditUV(self.shell, u=-minCoord[0], v=-minCoord[1])# Move shell to origin
 
     def TurnShell(self):# Method to rotate UV shell by 90 degrees
-        mc.select(self.shell, r=True)# Select the UV shell
-        mel.eval("polyRotateUVs 90 0")# Rotate shell by 90 degrees using MEL
+        with ToolContext("selectSuperContext"):# Run the UV edit with the Select tool active
+            minCoord, maxCoord = self.GetShellBound()# Get UV bounds of the shell
+            cu = (minCoord[0] + maxCoord[0]) / 2# Center of the shell in U
+            cv = (minCoord[1] + maxCoord[1]) / 2# Center of the shell in V
+            mc.polyEditUV(self.shell, pu=cu, pv=cv, a=90)# Rotate shell by 90 degrees around its center without touching the selection
 
     def CreateInitializationSection(self):# Create UI section for initial shell setup
         sectionLayout = QHBoxLayout()# Define horizontal layout for initialization section
@@ -167,30 +176,39 @@ class TrimSheetBuilderWidget(QWidget): # Define custom QWidget for the trim shee
         sectionLayout.addWidget(cutAndUnfoldBtn)
 
     def CutAndUnfoldShell(self):# Method to cut selected edges and unfold the UV shell
-        edges = mc.ls(sl=True)# Get selected edges
-        mc.polyProjection(self.shell, type="Planar", md="c")# Apply a planar projection to the UV shell
-        mc.polyMapCut(edges)# Cut the UVs at the selected edges
-        mc.u3dUnfold(self.Shell)# Unfold the shell after cutting
-        mel.eval("textOrientShells")# Orient the UV shells using MEL to improve layout
+        with SuspendRefresh():# Redraw once when every command has run
+            edges = mc.ls(sl=True)# Get selected edges
+            shellStr = " ".join(f'"{component}"' for component in self.shell)# Shell components as MEL arguments
+            edgesStr = " ".join(f'"{edge}"' for edge in edges)# Selected edges as MEL arguments
+            mel.eval(f"polyProjection -type Planar -md c {shellStr};"# Apply a planar projection to the UV shell
+                     f"polyMapCut {edgesStr};"# Cut the UVs at the selected edges
+                     f"u3dUnfold {shellStr};"# Unfold the shell after cutting
+                     "textOrientShells;")# Orient the UV shells to improve layout, all in a single MEL call
 
     def UnfoldShell(self):# Method to apply a planar projection and unfold the UV shell
-        mc.polyProjection(self.shell, type="Planar", md="c")# Project shell as a planar map
-        mc.u3dUnfold(self.shell)# Unfold the shell using Maya's unfold tool
+        with SuspendRefresh():# Redraw once when every command has run
+            mc.polyProjection(self.shell, type="Planar", md="c")# Project shell as a planar map
+            mc.u3dUnfold(self.shell)# Unfold the shell using Maya's unfold tool
 
 
     def SelectShell(self):# Method to select UV shell components
-        self.shell = mc.ls(sl=True, fl=True)# Store selected components as the shell
+        shellSel = om2.MGlobal.getActiveSelectionList()# Grab the selection through the API without building a string per component
+        self.shell = list(shellSel.getSelectionStrings())# Store selected components as the shell, keeping compact ranges like map[0:399]
 
 
-    @staticmethod
-    def GetMayaMainWindow():# Static method to get the main Maya window as a parent
-        mainWindow = omui.MQtUtil.mainWindow()# Get the Maya main window's pointer
-        return wrapInstance(int(mainWindow), QMainWindow)# Convert pointer to QMainWindow instance
+    @classmethod
+    def GetMayaMainWindow(cls):# Class method to get the main Maya window as a parent
+        if cls.mayaMainWindow is None:# Only wrap the pointer the first time
+            mainWindow = omui.MQtUtil.mainWindow()# Get the Maya main window's pointer
+            cls.mayaMainWindow = wrapInstance(int(mainWindow), QMainWindow)# Convert pointer to QMainWindow instance
+        return cls.mayaMainWindow
     
     @staticmethod
     def GetWindowUniqueId():# Static method to get a unique identifier for the widget
         return "53ef72c88116817fe7265383a6591a6f"# Return unique ID for identifying the widget instance
 
 def Run():# Function to create and display the TrimSheetBuilderWidget
-    TrimSheetBuilderWidget().show()# Show the widget when the script is run
-    
+    if TrimSheetBuilderWidget.instance is None or not isValid(TrimSheetBuilderWidget.instance):# Only build the widget once
+        TrimSheetBuilderWidget.instance = TrimSheetBuilderWidget()
+    TrimSheetBuilderWidget.instance.show()# Show the widget when the script is run
+    TrimSheetBuilderWidget.instance.raise_()# Bring it to the front if it was already open
@@ -3,18 +3,34 @@ import maya.cmds as mc
 import maya.mel as mel
 
 # Import Maya vector for 3D manipulation and OpenMayaUI for UI interaction
-from maya.OpenMaya import MVector
+import maya.api.OpenMaya as om2# Python API 2.0 for vectors and fast transform queries
 import maya.OpenMayaUI as omui
 
 # Import PySide2 for GUI creation and shiboken2 to handle QWidget instances in Maya
 from PySide2.QtWidgets import QVBoxLayout, QWidget, QPushButton, QMainWindow, QHBoxLayout, QGridLayout, QLineEdit, QLabel, QSlider
-from PySide2.QtCore import Qt
-from shiboken2 import wrapInstance
+from PySide2.QtCore import Qt, QTimer
+from shiboken2 import wrapInstance, isValid
 
-#copy/paste the following on the MEL Maya script Editor to connect VSC to Maya then Alt + Shift + M to run the code
+# Import the shared tool and refresh context managers, relative when loaded from the shelf as <plugin>.src,
+# absolute when the file is run as a top-level script (src folder on Maya's Python path)
+try:
+    from .mayaUtils import SuspendRefresh
+except ImportError:
+    from mayaUtils import SuspendRefresh
+
+#copy/paste the following on the MEL Maya script Editor to connect VSC to Maya then Alt + Shift + M to run the code (add this src folder to Maya's Python path first so mayaUtils can be imported)
 #commandPort -n "localhost:7001" -stp "mel";
 
+# Point positions and knots of the control curve shapes, built once when the module loads
+BLEND_CTRL_CURVE_POINTS = [(-1, 1, 0), (-1, 3, 0), (1, 3, 0), (1, 1, 0), (3, 1, 0), (3, -1, 0), (1, -1, 0), (1, -3, 0), (-1, -3, 0), (-1, -1, 0), (-3, -1, 0), (-3, 1, 0), (-1, 1, 0)]# Plus shape of the IK/FK blend control
+BLEND_CTRL_CURVE_KNOTS = list(range(len(BLEND_CTRL_CURVE_POINTS)))
+IK_END_CTRL_CURVE_POINTS = [(-0.5, 0.5, 0.5), (0.5, 0.5, 0.5), (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5), (-0.5, 0.5, 0.5), (-0.5, -0.5, 0.5), (-0.5, -0.5, -0.5), (-0.5, 0.5, -0.5), (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5), (-0.5, -0.5, 0.5), (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (0.5, 0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5), (-0.5, -0.5, 0.5), (-0.5, 0.5, 0.5), (0.5, 0.5, 0.5)]# Cube shape of the IK end control
+IK_END_CTRL_CURVE_KNOTS = list(range(len(IK_END_CTRL_CURVE_POINTS)))
+
 class LimbRiggerWidget(QWidget):# Main class for the Limb Rigging Tool UI.
+    instance = None# Widget shown by Run(), reused instead of rebuilding the UI every time.
+    mayaMainWindow = None# Maya's main window, wrapped once since it never changes during a session.
+
     def __init__(self):
         mainWindow: QMainWindow = LimbRiggerWidget.GetMayaMainWindow()# Get Maya's main window instance.
 
@@ -22,11 +38,13 @@ class LimbRiggerWidget(QWidget):# Main class for the Limb Rigging Tool UI.
             existing.deleteLater()# Delete any existing instances of this widget.
 
         super().__init__(parent=mainWindow) # Initialize the QWidget with Maya's main window as the parent.
+        self.setUpdatesEnabled(False)# Hold repaints while the UI is built so Qt lays it out once.
         
         self.setWindowTitle("Limb Rigging Tool")# Set the window title.
         self.setWindowFlags(Qt.Window)# Set window type to Qt Window.
         self.setObjectName(LimbRiggerWidget.GetWindowUniqueId())# Set a unique object name for the window.
         self.controllerSize = 15# Set the default controller size.
+        self.pendingControllerSize = self.controllerSize# Latest slider value waiting to be applied.
 
         self.masterLayout = QVBoxLayout()# Create the main vertical layout.
         self.setLayout(self.masterLayout)# Set the main layout to the widget.
@@ -45,6 +63,10 @@ class LimbRiggerWidget(QWidget):# Main class for the Limb Rigging Tool UI.
         controllerSizeSlider.setOrientation(Qt.Horizontal)# Set slider orientation to horizontal.
         controllerSizeCtrlLayout.addWidget(controllerSizeSlider)# Add slider to the layout.
         self.sizeDisplayLabel = QLabel(str(self.controllerSize))# Display the current controller size.
+        self.controllerSizeTimer = QTimer(self)# Timer coalescing slider drags into at most one update per frame.
+        self.controllerSizeTimer.setSingleShot(True)
+        self.controllerSizeTimer.setInterval(16)# About 60 updates per second.
+        self.controllerSizeTimer.timeout.connect(self.ApplyControllerSize)
         controllerSizeSlider.valueChanged.connect(self.ControllerSizeChanged)# Connect slider to size change method.
         controllerSizeCtrlLayout.addWidget(self.sizeDisplayLabel) # Add size display label to the layout.
 
@@ -52,62 +74,75 @@ class LimbRiggerWidget(QWidget):# Main class for the Limb Rigging Tool UI.
         rigLimButton = QPushButton("Rig The Limb")# Button to rig the limb.
         rigLimButton.clicked.connect(self.RigTheLimb)# Connect button to the rigging function.
         self.masterLayout.addWidget(rigLimButton)# Add button to the main layout.
+        self.setUpdatesEnabled(True)# UI is built, allow repaints again.
 
     def RigTheLimb(self):# Main function to rig the limb.
-        selection = mc.ls(sl=True)# Get the selected joints.
+        if self.controllerSizeTimer.isActive():# Apply a slider change that is still waiting on the timer.
+            self.controllerSizeTimer.stop()
+            self.ApplyControllerSize()
+
+        with SuspendRefresh():# Redraw once when every command has run
+            selection = mc.ls(sl=True)# Get the selected joints.
 
-        rootJnt = selection[0]# Root joint.
-        midJnt = selection[1]# Middle joint.
-        endJnt = selection[2]# End joint.
+            rootJnt = selection[0]# Root joint.
+            midJnt = selection[1]# Middle joint.
+            endJnt = selection[2]# End joint.
 
-        rootFKCtrl, rootFKCtrlGrp = self.CreateFKForJnt(rootJnt)# Create FK control for root joint.
-        midFKCtrl, midFKCtrlGrp = self.CreateFKForJnt(midJnt)# Create FK control for mid joint.
-        endFKCtrl, endFKCtrlGrp = self.CreateFKForJnt(endJnt)# Create FK control for end joint.
+            fkCtrls = self.CreateFKForJnts([rootJnt, midJnt, endJnt])# Create FK controls for the root, mid and end joints.
+            (rootFKCtrl, rootFKCtrlGrp), (midFKCtrl, midFKCtrlGrp), (endFKCtrl, endFKCtrlGrp) = fkCtrls
 
-        mc.parent(midFKCtrlGrp, rootFKCtrl)# Parent mid FK control to root FK control.
-        mc.parent(endFKCtrlGrp, midFKCtrl)# Parent end FK control to mid FK control.
+            mc.parent(midFKCtrlGrp, rootFKCtrl)# Parent mid FK control to root FK control.
+            mc.parent(endFKCtrlGrp, midFKCtrl)# Parent end FK control to mid FK control.
 
-        ikEndCtrlName, ikEndCtrlGrpName, midIkCtrlName, midIkCtrlGrpName, ikHandleName = self.CreateIkControl(rootJnt, midJnt, endJnt) # Create IK controls.
+            ikEndCtrlName, ikEndCtrlGrpName, midIkCtrlName, midIkCtrlGrpName, ikHandleName = self.CreateIkControl(rootJnt, midJnt, endJnt) # Create IK controls.
 
-        ikfkBlendCtrlName = "ac_ikfk_blend_" + rootJnt# Name for the IK/FK blend control.
-        mel.eval(f"curve -d 1 -n {ikfkBlendCtrlName} -p -1 1 0 -p -1 3 0 -p 1 3 0 -p 1 1 0 -p 3 1 0 -p 3 -1 0 -p 1 -1 0 -p 1 -3 0 -p -1 -3 0 -p -1 -1 0 -p -3 -1 0 -p -3 1 0 -p -1 1 0 -k 0 -k 1 -k 2 -k 3 -k 4 -k 5 -k 6 -k 7 -k 8 -k 9 -k 10 -k 11 -k 12 ;")# Create the IK/FK blend control shape.
-        ikfkBlendCtrlGrpName = ikfkBlendCtrlName + "_grp"# Name for IK/FK blend control group.
-        mc.group(ikfkBlendCtrlName, n = ikfkBlendCtrlGrpName)# Group the IK/FK blend control.
+            ikfkBlendCtrlName = "ac_ikfk_blend_" + rootJnt# Name for the IK/FK blend control.
+            mc.curve(d=1, n=ikfkBlendCtrlName, p=BLEND_CTRL_CURVE_POINTS, k=BLEND_CTRL_CURVE_KNOTS)# Create the IK/FK blend control shape.
+            ikfkBlendCtrlGrpName = ikfkBlendCtrlName + "_grp"# Name for IK/FK blend control group.
+            mc.group(ikfkBlendCtrlName, n = ikfkBlendCtrlGrpName)# Group the IK/FK blend control.
 
-        rootJntPosVals = mc.xform(rootJnt, t=True, q=True, ws=True)# Get the world-space position of the root joint.
-        rootJntPos = MVector(rootJntPosVals[0], rootJntPosVals[1], rootJntPosVals[2])# Convert to MVector.
-        ikfkBlendCtrlPos = rootJntPos + MVector(rootJntPos.x, 0, 0)# Offset IK/FK blend control position.
-        mc.move(ikfkBlendCtrlPos[0], ikfkBlendCtrlPos[1], ikfkBlendCtrlPos[2], ikfkBlendCtrlGrpName)# Move IK/FK blend control to position.
+            rootJntPos = LimbRiggerWidget.GetWorldPosition(rootJnt)# Get the world-space position of the root joint.
+            ikfkBlendCtrlPos = rootJntPos + om2.MVector(rootJntPos.x, 0, 0)# Offset IK/FK blend control position.
+            mc.move(ikfkBlendCtrlPos[0], ikfkBlendCtrlPos[1], ikfkBlendCtrlPos[2], ikfkBlendCtrlGrpName)# Move IK/FK blend control to position.
 
-        ikfkBlendAttrName = "ikfk_blend"# Attribute name for IK/FK blending.
-        mc.addAttr(ikfkBlendCtrlName, ln=ikfkBlendAttrName, k=True, min = 0, max = 1)# Add IK/FK blend attribute.
+            ikfkBlendAttrName = "ikfk_blend"# Attribute name for IK/FK blending.
+            mc.addAttr(ikfkBlendCtrlName, ln=ikfkBlendAttrName, k=True, min = 0, max = 1)# Add IK/FK blend attribute.
 
-        mc.expression(s=f"{rootFKCtrlGrp}.v=1-{ikfkBlendCtrlName}.{ikfkBlendAttrName};") # Set visibility of FK based on blend.
-        mc.expression(s=f"{ikEndCtrlGrpName}.v={ikfkBlendCtrlName}.{ikfkBlendAttrName}")# Set visibility of IK controls.
-        mc.expression(s=f"{midIkCtrlGrpName}.v={ikfkBlendCtrlName}.{ikfkBlendAttrName}")# Set visibility for mid IK.
-        mc.expression(s=f"{ikHandleName}.ikBlend={ikfkBlendCtrlName}.{ikfkBlendAttrName}")# Set IK blend value.
+            ikfkBlendAttr = f"{ikfkBlendCtrlName}.{ikfkBlendAttrName}"# Full path to the IK/FK blend attribute.
+            ikfkReverseName = mc.createNode("reverse", n=ikfkBlendCtrlName + "_reverse")# Reverse node computing 1 - blend for the FK side.
+            mc.connectAttr(ikfkBlendAttr, ikfkReverseName + ".inputX")# Feed the blend into the reverse node.
 
-        endJntOrientConstraint = mc.listConnections(endJnt, s=True, t= 'orientConstraint')[0]# Get orient constraint for end joint.
-        mc.expression(s=f"{endJntOrientConstraint}.{endFKCtrl}W0=1-{ikfkBlendCtrlName}.{ikfkBlendAttrName};")# FK influence expression.
-        mc.expression(s=f"{endJntOrientConstraint}.{ikEndCtrlName}W1={ikfkBlendCtrlName}.{ikfkBlendAttrName};")# IK influence expression.
+            mc.connectAttr(ikfkReverseName + ".outputX", rootFKCtrlGrp + ".v") # Set visibility of FK based on blend.
+            mc.connectAttr(ikfkBlendAttr, ikEndCtrlGrpName + ".v")# Set visibility of IK controls.
+            mc.connectAttr(ikfkBlendAttr, midIkCtrlGrpName + ".v")# Set visibility for mid IK.
+            mc.connectAttr(ikfkBlendAttr, ikHandleName + ".ikBlend")# Set IK blend value.
 
-        topGrpName = f"{rootJnt}_rig_grp"# Name for top rig group.
+            endJntOrientConstraint = mc.listConnections(endJnt, s=True, t= 'orientConstraint')[0]# Get orient constraint for end joint.
+            mc.connectAttr(ikfkReverseName + ".outputX", f"{endJntOrientConstraint}.{endFKCtrl}W0")# FK influence.
+            mc.connectAttr(ikfkBlendAttr, f"{endJntOrientConstraint}.{ikEndCtrlName}W1")# IK influence.
 
-        mc.group([rootFKCtrlGrp, ikEndCtrlGrpName, midIkCtrlGrpName,ikfkBlendCtrlGrpName], n = topGrpName)# Group all components.
+            topGrpName = f"{rootJnt}_rig_grp"# Name for top rig group.
 
-    def CreateFKForJnt(self, jnt):# Method to create an FK control for a joint
-        fkCtrlName = "ac_fk_" + jnt# Name for FK control.
-        fkCtrlGrpName = fkCtrlName + "_grp"# Name for FK control group.
-        mc.circle(n=fkCtrlName, r=self.controllerSize, nr=(1,0,0)) # Create FK control circle.
-        mc.group(fkCtrlName, n = fkCtrlGrpName)# Group FK control
-        mc.matchTransform(fkCtrlGrpName, jnt)# Match FK control position with joint.
-        mc.orientConstraint(fkCtrlName, jnt)# Constrain joint orientation to FK control.
-        return fkCtrlName, fkCtrlGrpName
+            mc.group([rootFKCtrlGrp, ikEndCtrlGrpName, midIkCtrlGrpName,ikfkBlendCtrlGrpName], n = topGrpName)# Group all components.
+
+    def CreateFKForJnts(self, jnts):# Method to create an FK control for each joint with a single MEL call
+        fkCtrls = []# FK control and group names for each joint.
+        fkScript = ""# MEL script building every FK control.
+        for jnt in jnts:
+            fkCtrlName = "ac_fk_" + jnt# Name for FK control.
+            fkCtrlGrpName = fkCtrlName + "_grp"# Name for FK control group.
+            fkScript += f'circle -n "{fkCtrlName}" -r {self.controllerSize} -nr 1 0 0;'# Create FK control circle.
+            fkScript += f'group -n "{fkCtrlGrpName}" "{fkCtrlName}";'# Group FK control
+            fkScript += f'matchTransform "{fkCtrlGrpName}" "{jnt}";'# Match FK control position with joint.
+            fkScript += f'orientConstraint "{fkCtrlName}" "{jnt}";'# Constrain joint orientation to FK control.
+            fkCtrls.append((fkCtrlName, fkCtrlGrpName))
+        mel.eval(fkScript)# Run the commands for every joint at once.
+        return fkCtrls
 
     def CreateIkControl(self, rootJnt, midJnt, endJnt): # Creates the IK control
         #wrist controller
         ikEndCtrlName = "ac_ik_" + endJnt# Name fir IK control
-        mel.eval(f"curve -d 1 -n {ikEndCtrlName} -p -0.5 0.5 0.5 -p 0.5 0.5 0.5 -p 0.5 0.5 -0.5 -p -0.5 0.5 -0.5 -p -0.5 0.5 0.5 -p -0.5 -0.5 0.5 -p -0.5 -0.5 -0.5 -p -0.5 0.5 -0.5 -p -0.5 -0.5 -0.5 -p 0.5 -0.5 -0.5 -p 0.5 -0.5 0.5 -p -0.5 -0.5 0.5 -p -0.5 -0.5 -0.5 -p 0.5 -0.5 -0.5 -p 0.5 -0.5 0.5 -p 0.5 0.5 0.5 -p 0.5 0.5 -0.5 -p 0.5 -0.5 -0.5 -p 0.5 -0.5 0.5 -p -0.5 -0.5 0.5 -p -0.5 0.5 0.5 -p 0.5 0.5 0.5 -k 0 -k 1 -k 2 -k 3 -k 4 -k 5 -k 6 -k 7 -k 8 -k 9 -k 10 -k 11 -k 12 -k 13 -k 14 -k 15 -k 16 -k 17 -k 18 -k 19 -k 20 -k 21 ;")# Creates shape for IK control.
+        mc.curve(d=1, n=ikEndCtrlName, p=IK_END_CTRL_CURVE_POINTS, k=IK_END_CTRL_CURVE_KNOTS)# Creates shape for IK control.
         mc.scale(self.controllerSize, self.controllerSize, self.controllerSize, ikEndCtrlName, r=True)# Scales the IK control to match the user-defined controller size.
         mc.makeIdentity(ikEndCtrlName, apply = True) #freeze transformation
         ikEndCtrlGrpName = ikEndCtrlName + "_grp"# Creates name for IK group.
@@ -119,18 +154,15 @@ class LimbRiggerWidget(QWidget):# Main class for the Limb Rigging Tool UI.
         ikHandleName = "ikHandle_" + endJnt# Names the IK handle
         mc.ikHandle(n=ikHandleName, sj=rootJnt, ee=endJnt, sol="ikRPsolver") # Creates an IK handle from the root joint to the end joint using an IKRP solver (rotation-plane IK).
 
-        rootJntPosVals = mc.xform(rootJnt, q=True, t=True, ws=True) #getting the world space(ws=True) translate(t+True) of the root Jnt, as a list of 3 values
-        rootJntPos = MVector(rootJntPosVals[0], rootJntPosVals[1], rootJntPosVals[2])# Converts the root joint's position into a MVector
-
-        endJntPosVals = mc.xform(endJnt, q=True, t=True, ws=True) # Queries the world space position of the end joint.
-        endJntPos = MVector(endJntPosVals[0], endJntPosVals[1], endJntPosVals[2])# Converts the end joint's position into a MVector.
+        rootJntPos = LimbRiggerWidget.GetWorldPosition(rootJnt)# Gets the world space position of the root joint as a MVector
+        endJntPos = LimbRiggerWidget.GetWorldPosition(endJnt)# Gets the world space position of the end joint as a MVector
 
         poleVectorVals = mc.getAttr(ikHandleName + ".poleVector")[0]# Retrieves the pole vector attribute values from the IK handle.
-        poleVector = MVector(poleVectorVals[0], poleVectorVals[1], poleVectorVals[2])# Converts the pole vector to an MVector and normalizes it
+        poleVector = om2.MVector(poleVectorVals[0], poleVectorVals[1], poleVectorVals[2])# Converts the pole vector to an MVector and normalizes it
         poleVector.normalize()
 
         vectorToEnd = endJntPos - rootJntPos# Calculates the direction vector from the root joint to the end joint.
-        LimbDirOffset: MVector = vectorToEnd/2
+        LimbDirOffset: om2.MVector = vectorToEnd/2
 
         poleVectorDirOffset = poleVector * LimbDirOffset.length()# Scales the pole vector direction by the limb's half-length to position it correctly.
         midIkCtrlPos = rootJntPos + LimbDirOffset + poleVectorDirOffset
@@ -154,21 +186,36 @@ class LimbRiggerWidget(QWidget):# Main class for the Limb Rigging Tool UI.
 
 
 
-    def ControllerSizeChanged(self, sliderVal):
-        self.sizeDisplayLabel.setText(str(sliderVal))
-        self.controllerSize = sliderVal
+    def ControllerSizeChanged(self, sliderVal):# Stores the slider value and applies it when the timer fires.
+        self.pendingControllerSize = sliderVal
+        if not self.controllerSizeTimer.isActive():
+            self.controllerSizeTimer.start()
+
+    def ApplyControllerSize(self):# Applies the latest slider value.
+        self.sizeDisplayLabel.setText(str(self.pendingControllerSize))
+        self.controllerSize = self.pendingControllerSize
 
 
 
     @staticmethod
-    def GetMayaMainWindow():
-        mainWindow = omui.MQtUtil.mainWindow()
-        return wrapInstance(int(mainWindow), QMainWindow)
+    def GetWorldPosition(node):# Returns the world space translation of a transform as a MVector
+        nodeSel = om2.MSelectionList()# Resolve the node through the API instead of going through mc.xform
+        nodeSel.add(node)
+        return om2.MFnTransform(nodeSel.getDagPath(0)).translation(om2.MSpace.kWorld)
+
+    @classmethod
+    def GetMayaMainWindow(cls):
+        if cls.mayaMainWindow is None:
+            mainWindow = omui.MQtUtil.mainWindow()
+            cls.mayaMainWindow = wrapInstance(int(mainWindow), QMainWindow)
+        return cls.mayaMainWindow
     
     @staticmethod
     def GetWindowUniqueId():
         return "53ef72c18116817fe7265383a6591a6f"
 
 def Run():
-    LimbRiggerWidget().show()
-
+    if LimbRiggerWidget.instance is None or not isValid(LimbRiggerWidget.instance):# Only build the widget once.
+        LimbRiggerWidget.instance = LimbRiggerWidget()
+    LimbRiggerWidget.instance.show()
+    LimbRiggerWidget.instance.raise_()
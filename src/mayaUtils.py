@@ -0,0 +1,26 @@
+# Import contextlib to build the tool and refresh context managers
+import contextlib
+
+# Import Maya commands as 'mc'
+import maya.cmds as mc
+
+
+@contextlib.contextmanager
+def ToolContext(context):# Context manager to run Maya commands with the given tool active
+    previousCtx = mc.currentCtx()# Remember the active tool to restore it afterwards
+    if previousCtx != context:
+        mc.setToolTo(context)
+    try:
+        yield
+    finally:
+        if previousCtx != context:
+            mc.setToolTo(previousCtx)# Restore the user's tool
+
+@contextlib.contextmanager
+def SuspendRefresh():# Context manager to run several Maya commands without redrawing after each one
+    with ToolContext("selectSuperContext"):# Manipulator tools do extra work on every component or node touched, use the Select tool
+        mc.refresh(suspend=True)# Stop viewport and UV editor redraws
+        try:
+            yield
+        finally:
+            mc.refresh(suspend=False)# Resume redraws